@@ -17,6 +17,7 @@
 from typing import Any, Optional, List, Dict, Union, Tuple
 
 import dataclasses
+import numpy as np
 import tensorflow.compat.v2 as tf
 
 from tf_quant_finance import datetime as dateslib
@@ -165,7 +166,7 @@ class AmericanOption(instrument.Instrument):
       # TODO(b/160446193): Calendar is ignored at the moment
       calendar = dateslib.create_holiday_calendar(
           weekend_mask=dateslib.WeekendMask.SATURDAY_SUNDAY)
-      if isinstance(expiry_date, types.IntTensor):
+      if isinstance(expiry_date, (np.ndarray, types.IntTensor)):
         self._expiry_date = dateslib.dates_from_tensor(expiry_date)
       else:
         self._expiry_date = dateslib.convert_to_date_tensor(expiry_date)
@@ -266,7 +267,7 @@ class AmericanOption(instrument.Instrument):
       cls,
       proto_list: List[american_option_pb2.AmericanEquityOption],
       config: AmericanOptionConfig = None
-      ) -> Dict[str, List["AmericanOption"]]:
+      ) -> Dict[Tuple[int, int], List["AmericanOption"]]:
     return proto_utils.group_protos(proto_list, config)
 
   def price(self,
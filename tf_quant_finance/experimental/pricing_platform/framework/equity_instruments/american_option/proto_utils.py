@@ -13,11 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Utilities for proto processing."""
+import functools
+import operator
 from typing import Any, List, Dict, Tuple, Optional
 
+import numpy as np
 import tensorflow.compat.v2 as tf
 
-from tf_quant_finance.experimental.pricing_platform.framework import utils
 from tf_quant_finance.experimental.pricing_platform.framework.core import business_days
 from tf_quant_finance.experimental.pricing_platform.framework.core import currencies
 from tf_quant_finance.experimental.pricing_platform.framework.core import curve_types as curve_types_lib
@@ -27,82 +29,114 @@ from tf_quant_finance.experimental.pricing_platform.framework.rate_instruments i
 from tf_quant_finance.experimental.pricing_platform.framework.rate_instruments import utils as instrument_utils
 from tf_quant_finance.experimental.pricing_platform.instrument_protos import american_equity_option_pb2 as american_option_pb2
 
+# The proto enums take only a handful of distinct values, so the conversion
+# results are memoized.
+_convention_from_proto_value = functools.lru_cache(maxsize=None)(
+    business_days.convention_from_proto_value)
+_holiday_from_proto_value = functools.lru_cache(maxsize=None)(
+    business_days.holiday_from_proto_value)
 
-def _get_hash(
-    american_option_proto: american_option_pb2.AmericanEquityOption
-    ) -> Tuple[int, types.CurrencyProtoType]:
-  """Computes hash key for the batching strategy."""
-  currency = currencies.from_proto_value(american_option_proto.currency)
-  bank_holidays = american_option_proto.bank_holidays
-  business_day_convention = american_option_proto.business_day_convention
-  h = utils.hasher([bank_holidays, business_day_convention])
-  return h, currency
+# Extracts all proto fields used by the fill pass of `_build_groups` in a
+# single C call to avoid repeated protobuf descriptor lookups.
+_OPTION_FIELDS = operator.attrgetter(
+    "short_position", "expiry_date", "equity", "contract_amount",
+    "strike", "settlement_days", "is_call_option", "metadata", "currency")
+
+
+def _build_groups(
+    proto_list: List[american_option_pb2.AmericanEquityOption],
+    config: "AmericanOptionConfig" = None
+    ) -> Tuple[Dict[Tuple[int, int], List["AmericanOption"]],
+               Dict[Tuple[int, int], Any]]:
+  """Groups protos and preprocesses their data into pre-sized containers."""
+  # Counting pass: the enum pair is hashable and identifies the batch, so
+  # it is used as a dictionary key directly. Knowing the group sizes up
+  # front lets the per-group containers be allocated at their final size.
+  keys = [None] * len(proto_list)
+  counts = {}
+  for i, am_option_proto in enumerate(proto_list):
+    h = (am_option_proto.bank_holidays,
+         am_option_proto.business_day_convention)
+    keys[i] = h
+    counts[h] = counts.get(h, 0) + 1
+  grouped_options = {}
+  prepare_fras = {}
+  cursors = {}
+  for h, num_options in counts.items():
+    grouped_options[h] = [None] * num_options
+    # Numeric columns are allocated as typed ndarrays so that no
+    # per-element Python object survives the build.
+    prepare_fras[h] = {"short_position": np.empty(num_options, dtype=np.bool_),
+                       "currency": [None] * num_options,
+                       "expiry_date": [None] * num_options,
+                       "equity": [None] * num_options,
+                       "contract_amount": [None] * num_options,
+                       "strike": [None] * num_options,
+                       "is_call_option": np.empty(num_options, dtype=np.bool_),
+                       "settlement_days": np.empty(num_options,
+                                                   dtype=np.int32),
+                       "batch_names": [None] * num_options}
+    cursors[h] = 0
+  # Fill pass. Hoisted to locals to avoid global and attribute lookups in
+  # the hot loop
+  get_fields = _OPTION_FIELDS
+  currency_from_proto_value = currencies.from_proto_value
+  for i, am_option_proto in enumerate(proto_list):
+    (short_position, expiry_date, equity, contract_amount,
+     strike, settlement_days, is_call_option, metadata,
+     currency_value) = get_fields(am_option_proto)
+    h = keys[i]
+    idx = cursors[h]
+    cursors[h] = idx + 1
+    grouped_options[h][idx] = am_option_proto
+    entry = prepare_fras[h]
+    entry["short_position"][idx] = short_position
+    entry["expiry_date"][idx] = (expiry_date.year,
+                                 expiry_date.month,
+                                 expiry_date.day)
+    entry["equity"][idx] = equity
+    entry["currency"][idx] = currency_from_proto_value(currency_value)
+    entry["contract_amount"][idx] = contract_amount
+    entry["strike"][idx] = strike
+    entry["is_call_option"][idx] = is_call_option
+    entry["settlement_days"][idx] = settlement_days
+    entry["batch_names"][idx] = [metadata.id, metadata.instrument_type]
+  # Decimal and enum conversions are batched per group to amortize the
+  # Python call overhead over the group size.
+  for h, entry in prepare_fras.items():
+    bank_holidays, business_day_convention = h
+    # The date column is materialized as a single int32 ndarray per group,
+    # ready for tensor conversion downstream.
+    entry["expiry_date"] = np.asarray(entry["expiry_date"], dtype=np.int32)
+    num_options = len(entry["equity"])
+    entry["contract_amount"] = np.fromiter(
+        map(instrument_utils.decimal_to_double, entry["contract_amount"]),
+        dtype=np.float64, count=num_options)
+    entry["strike"] = np.fromiter(
+        map(instrument_utils.decimal_to_double, entry["strike"]),
+        dtype=np.float64, count=num_options)
+    entry["business_day_convention"] = _convention_from_proto_value(
+        business_day_convention)
+    entry["calendar"] = _holiday_from_proto_value(bank_holidays)
+    entry["config"] = config
+  return grouped_options, prepare_fras
 
 
 def group_protos(
     proto_list: List[american_option_pb2.AmericanEquityOption],
     config: "AmericanOptionConfig" = None
-    ) -> Dict[str, List["AmericanOption"]]:
+    ) -> Dict[Tuple[int, int], List["AmericanOption"]]:
   """Creates a dictionary of grouped protos."""
-  del config  # not used for now
-  grouped_options = {}
-  for american_option in proto_list:
-    h, _ = _get_hash(american_option)
-    if h in grouped_options:
-      grouped_options[h].append(american_option)
-    else:
-      grouped_options[h] = [american_option]
+  grouped_options, _ = _build_groups(proto_list, config)
   return grouped_options
 
 
 def from_protos(
     proto_list: List[american_option_pb2.AmericanEquityOption],
     config: "AmericanOptionConfig" = None
-    ) -> Dict[str, Any]:
+    ) -> Dict[Tuple[int, int], Any]:
   """Creates a dictionary of preprocessed swap data."""
-  prepare_fras = {}
-  for am_option_proto in proto_list:
-    short_position = am_option_proto.short_position
-    h, currency = _get_hash(am_option_proto)
-    expiry_date = am_option_proto.expiry_date
-    expiry_date = [expiry_date.year,
-                   expiry_date.month,
-                   expiry_date.day]
-    equity = am_option_proto.equity
-    contract_amount = instrument_utils.decimal_to_double(
-        am_option_proto.contract_amount)
-    business_day_convention = business_days.convention_from_proto_value(
-        am_option_proto.business_day_convention)
-    strike = instrument_utils.decimal_to_double(am_option_proto.strike)
-    calendar = business_days.holiday_from_proto_value(
-        am_option_proto.bank_holidays)
-    settlement_days = am_option_proto.settlement_days
-    is_call_option = am_option_proto.is_call_option
-    name = am_option_proto.metadata.id
-    instrument_type = am_option_proto.metadata.instrument_type
-    if h not in prepare_fras:
-      prepare_fras[h] = {"short_position": [short_position],
-                         "currency": [currency],
-                         "expiry_date": [expiry_date],
-                         "equity": [equity],
-                         "contract_amount": [contract_amount],
-                         "business_day_convention": business_day_convention,
-                         "calendar": calendar,
-                         "strike": [strike],
-                         "is_call_option": [is_call_option],
-                         "settlement_days": [settlement_days],
-                         "config": config,
-                         "batch_names": [[name, instrument_type]]}
-    else:
-      prepare_fras[h]["short_position"].append(short_position)
-      prepare_fras[h]["expiry_date"].append(expiry_date)
-      prepare_fras[h]["equity"].append(equity)
-      prepare_fras[h]["currency"].append(currency)
-      prepare_fras[h]["contract_amount"].append(contract_amount)
-      prepare_fras[h]["strike"].append(strike)
-      prepare_fras[h]["is_call_option"].append(is_call_option)
-      prepare_fras[h]["settlement_days"].append(settlement_days)
-      prepare_fras[h]["batch_names"].append([name, instrument_type])
+  _, prepare_fras = _build_groups(proto_list, config)
   return prepare_fras
 
 
@@ -14,8 +14,9 @@
 # limitations under the License.
 """Utilities for equity instruments."""
 
-from typing import List, Tuple
+from typing import List, Tuple, Union
 
+import numpy as np
 import tensorflow.compat.v2 as tf
 
 from tf_quant_finance import datetime as dateslib
@@ -24,12 +25,16 @@ from tf_quant_finance.experimental.pricing_platform.framework.core import types
 from tf_quant_finance.experimental.pricing_platform.framework.market_data import volatility_surface
 from tf_quant_finance.experimental.pricing_platform.framework.rate_instruments import cashflow_streams
 
+# Below this size the cost of boxing the mask into a Python list is
+# negligible, so the list representation is kept for convenience.
+_LARGE_EQUITY_BATCH_SIZE = 1024
+
 
 def process_equities(
     equities: List[str],
     mask: types.IntTensor = None
     ) -> Tuple[
-        List[str], List[int]]:
+        List[str], Union[List[int], np.ndarray]]:
   """Extracts unique equities and computes an integer mask.
 
   #### Example
@@ -47,16 +52,30 @@ def process_equities(
 
   Returns:
     A Tuple of `(equities, mask)` where  `equities` is a list of unique sorted
-    equities and `mask` is a list of integers which is the mask for `equities`.
+    equities and `mask` is the integer mask for `equities`, as a list of
+    integers for small inputs and as an integer ndarray for large ones.
   """
   equity_list = cashflow_streams.to_list(equities)
   if mask is not None:
     return equity_list, mask
-  # Note that `create_mask` sorts `equity_list`.
-  mask, mask_map, num_unique_equities = cashflow_streams.create_mask(
-      equity_list)
-  equity_types = [mask_map[i] for i in range(num_unique_equities)]
-  return equity_types, mask
+  # `np.unique` sorts the equities and computes the integer mask in C
+  equity_types, mask = np.unique(equity_list, return_inverse=True)
+  if len(equity_list) >= _LARGE_EQUITY_BATCH_SIZE:
+    # For large batches the mask stays an ndarray so that no per-element
+    # Python integer is created; consumers convert it to a tensor directly.
+    return equity_types.tolist(), mask
+  return equity_types.tolist(), mask.tolist()
+
+
+@tf.function
+def _gather_vol_nodes(expiries, strikes, volatilities, indices):
+  """Gathers the volatility surface nodes at the supplied indices.
+
+  The three gathers share a single indices tensor and run inside one graph so
+  that the grappler/XLA passes can fuse them.
+  """
+  return tf.nest.map_structure(
+      lambda t: tf.gather(t, indices), (expiries, strikes, volatilities))
 
 
 def get_vol_surface(
@@ -95,10 +114,50 @@ def get_vol_surface(
   expiries = vols.node_expiries().ordinal()
   strikes = vols.node_strikes()
   volatilities = vols.node_volatilities()
-  prepare_strikes = tf.gather(strikes, mask)
-  prepare_vols = tf.gather(volatilities, mask)
-  prepare_expiries = dateslib.dates_from_ordinals(
-      tf.gather(expiries, mask))
+  # Trivial masks are detected in Python so that no gather kernel is
+  # launched for them
+  is_constant = False
+  is_identity = False
+  if isinstance(mask, list) and mask:
+    is_constant = len(set(mask)) == 1
+    is_identity = not is_constant and mask == list(range(len(mask)))
+  elif isinstance(mask, np.ndarray) and mask.size > 0:
+    is_constant = bool((mask == mask[0]).all())
+    is_identity = (not is_constant
+                   and bool((mask == np.arange(mask.size)).all()))
+  if is_identity:
+    # Gathering [0, 1, ..., n - 1] only copies the input, but the result is
+    # equivalent only when the full tensors are selected
+    is_identity = all(
+        t.shape[0] is not None and t.shape[0] == len(mask)
+        for t in (expiries, strikes, volatilities))
+  if is_identity:
+    prepare_expiries, prepare_strikes, prepare_vols = (
+        expiries, strikes, volatilities)
+  elif is_constant:
+    # All instruments reference the same surface row. The row is selected
+    # with a gather so that an out-of-range index still raises instead of
+    # silently producing an empty slice.
+    row = int(mask[0])
+    [
+        prepare_expiries,
+        prepare_strikes,
+        prepare_vols,
+    ] = [tf.repeat(tf.gather(t, [row]), len(mask), axis=0)
+         for t in (expiries, strikes, volatilities)]
+  else:
+    # The mask is converted once and reused by all three gathers. Tensor
+    # masks keep their integer dtype since gather accepts any of them.
+    if tf.is_tensor(mask):
+      indices = mask
+    else:
+      indices = tf.convert_to_tensor(mask, dtype=tf.int32, name="mask")
+    [
+        prepare_expiries,
+        prepare_strikes,
+        prepare_vols,
+    ] = _gather_vol_nodes(expiries, strikes, volatilities, indices)
+  prepare_expiries = dateslib.dates_from_ordinals(prepare_expiries)
   # All curves are assumed to have the same interpolation method
   # TODO(b/168411153): Extend to the case with multiple curve configs.
   vol_surface = volatility_surface.VolatilitySurface(
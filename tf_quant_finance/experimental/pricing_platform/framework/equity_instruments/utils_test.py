@@ -0,0 +1,115 @@
+# Lint as: python3
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for equity instrument utils."""
+
+import tensorflow.compat.v2 as tf
+
+import tf_quant_finance as tff
+from tensorflow.python.framework import test_util  # pylint: disable=g-direct-tensorflow-import
+
+framework = tff.experimental.pricing_platform.framework
+equity_utils = framework.equity_instruments.utils
+market_data = framework.market_data
+
+
+@test_util.run_all_in_graph_and_eager_modes
+class UtilsTest(tf.test.TestCase):
+
+  def setUp(self):
+    vol_dates = [[2021, 2, 8], [2022, 2, 8], [2023, 2, 8],
+                 [2025, 2, 8], [2027, 2, 8]]
+    strikes_goog = [[1450, 1500, 1550],
+                    [1450, 1500, 1550],
+                    [1450, 1500, 1550],
+                    [1450, 1500, 1550],
+                    [1450, 1500, 1550]]
+    strikes_ezj = [[570, 590, 610],
+                   [570, 590, 610],
+                   [570, 590, 610],
+                   [570, 590, 610],
+                   [570, 590, 610]]
+    volatilities = [[0.1, 0.12, 0.13],
+                    [0.15, 0.2, 0.15],
+                    [0.1, 0.2, 0.1],
+                    [0.1, 0.2, 0.1],
+                    [0.1, 0.1, 0.3]]
+    self._market_data_dict = {
+        "equities": {
+            "USD": {
+                "GOOG": {
+                    "spot_price": 1500,
+                    "volatility_surface": {
+                        "dates": vol_dates,
+                        "strikes": strikes_goog,
+                        "implied_volatilities": volatilities
+                    }
+                }
+            },
+            "GBP": {
+                "EZJ": {
+                    "spot_price": 590,
+                    "volatility_surface": {
+                        "dates": vol_dates,
+                        "strikes": strikes_ezj,
+                        "implied_volatilities": volatilities
+                    }
+                }
+            }
+        },
+        "reference_date": [(2021, 2, 5)],
+    }
+    super(UtilsTest, self).setUp()
+
+  def assert_surfaces_equal(self, vol_surface, expected_surface):
+    """Checks that two volatility surfaces have the same nodes."""
+    with self.subTest("Expiries"):
+      self.assertAllEqual(vol_surface.node_expiries().ordinal(),
+                          expected_surface.node_expiries().ordinal())
+    with self.subTest("Strikes"):
+      self.assertAllClose(vol_surface.node_strikes(),
+                          expected_surface.node_strikes())
+    with self.subTest("Volatilities"):
+      self.assertAllClose(vol_surface.node_volatilities(),
+                          expected_surface.node_volatilities())
+
+  def test_get_vol_surface_identity_mask(self):
+    """Tests that the identity mask shortcut matches the gather result."""
+    market = market_data.MarketDataDict(self._market_data_dict)
+    currencies = ["USD", "GBP"]
+    equity_types = ["GOOG", "EZJ"]
+    mask = [0, 1]
+    vol_surface = equity_utils.get_vol_surface(
+        currencies, equity_types, market, mask)
+    # A tensor mask bypasses the Python shortcuts and uses plain gathers
+    expected_surface = equity_utils.get_vol_surface(
+        currencies, equity_types, market, tf.constant(mask))
+    self.assert_surfaces_equal(vol_surface, expected_surface)
+
+  def test_get_vol_surface_constant_mask(self):
+    """Tests that the constant mask shortcut matches the gather result."""
+    market = market_data.MarketDataDict(self._market_data_dict)
+    currencies = ["GBP"]
+    equity_types = ["EZJ"]
+    mask = [0, 0, 0]
+    vol_surface = equity_utils.get_vol_surface(
+        currencies, equity_types, market, mask)
+    # A tensor mask bypasses the Python shortcuts and uses plain gathers
+    expected_surface = equity_utils.get_vol_surface(
+        currencies, equity_types, market, tf.constant(mask))
+    self.assert_surfaces_equal(vol_surface, expected_surface)
+
+
+if __name__ == "__main__":
+  tf.test.main()